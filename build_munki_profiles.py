@@ -1,4 +1,4 @@
-#!/usr/bin/python
+#!/usr/bin/env python3
 # Copyright (C) 2015 Shea G Craig
 #
 # This program is free software: you can redistribute it and/or modify
@@ -18,7 +18,7 @@
 import argparse
 import os
 
-from munki_tools import FoundationPlist
+from spruce_tools import fast_plist as FoundationPlist
 
 
 def main():
@@ -72,7 +72,7 @@ def write_config_to(plist, path):
     try:
         FoundationPlist.writePlist(plist, os.path.expanduser(path))
     except FoundationPlist.NSPropertyListWriteException as error:
-        print error.message
+        print(error)
 
 
 if __name__ == "__main__":
@@ -1,15 +1,13 @@
-#!/usr/bin/python
+#!/usr/bin/env python3
 
 
-# TODO: just import this from munkilib
-import FoundationPlist
-
-from categories import run_categories, prepare_categories, update_categories
-from cruftmoji import SPRUCE
-from deprecate import deprecate
-from docs import handle_docs
-from icons import handle_icons
-from names import run_names
-from report import run_reports
-from robo_print import robo_print, LogLevel
-from tools import *
\ No newline at end of file
+from spruce_tools.categories import (run_categories, prepare_categories,
+                                     update_categories)
+from spruce_tools.cruftmoji import SPRUCE
+from spruce_tools.deprecate import deprecate
+from spruce_tools.docs import handle_docs
+from spruce_tools.icons import handle_icons
+from spruce_tools.names import run_names
+from spruce_tools.report import run_reports
+from spruce_tools.robo_print import robo_print, LogLevel
+from spruce_tools.tools import *
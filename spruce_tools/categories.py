@@ -1,4 +1,4 @@
-#!/usr/bin/python
+#!/usr/bin/env python3
 # Copyright 2016 Shea G. Craig
 #
 # Licensed under the Apache License, Version 2.0 (the "License");
@@ -25,7 +25,7 @@ from collections import Counter, defaultdict
 import os
 from xml.sax.saxutils import escape
 
-from spruce_tools import FoundationPlist
+from spruce_tools import fast_plist as FoundationPlist
 import spruce_tools as tools
 
 
@@ -52,7 +52,7 @@ def get_categories_and_counts(all_catalog):
         categories[NO_CATEGORY] += categories[""]
         del categories[""]
     for category in sorted(categories):
-        print "{}: {}".format(category.encode("utf-8"), categories[category])
+        print("{}: {}".format(category, categories[category]))
 
 
 def get_categories_and_files(all_catalog, categories):
@@ -69,9 +69,9 @@ def get_categories_and_files(all_catalog, categories):
             output[category].append((plist.get("name"), path))
 
     for key, val in output.items():
-        print "Category: {}".format(key)
+        print("Category: {}".format(key))
         for entry in sorted(val):
-            print "\t{}, {}".format(*entry)
+            print("\t{}, {}".format(*entry))
 
 
 def prepare_categories(_):
@@ -98,7 +98,7 @@ def prepare_categories(_):
         names_by_category[most_frequent_category].append(name)
 
     output.update(names_by_category)
-    print FoundationPlist.writePlistToString(output)
+    print(FoundationPlist.writePlistToString(output))
 
 
 def update_categories(args):
@@ -128,11 +128,11 @@ def update_categories(args):
                 plist["category"] = new_category
                 FoundationPlist.writePlist(plist, path)
                 changed = True
-                print "Pkginfo {} category set to {}.".format(
-                     path, new_category if new_category else "''")
+                print("Pkginfo {} category set to {}.".format(
+                     path, new_category if new_category else "''"))
 
     if changed:
-        print "Please run 'makecatalogs' to rebuild catalogs."
+        print("Please run 'makecatalogs' to rebuild catalogs.")
 
 
 def get_category_for_name(name, changes):
@@ -1,4 +1,4 @@
-#!/usr/bin/python
+#!/usr/bin/env python3
 # Copyright 2016 Shea G. Craig
 #
 # Licensed under the Apache License, Version 2.0 (the "License");
@@ -18,4 +18,4 @@
 """Definitions for our cruftmojis."""
 
 
-SPRUCE = "\xF0\x9F\x8C\xB2"
+SPRUCE = "\U0001F332"
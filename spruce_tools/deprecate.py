@@ -1,4 +1,4 @@
-#!/usr/bin/python
+#!/usr/bin/env python3
 # Copyright 2016 Shea G. Craig
 #
 # Licensed under the Apache License, Version 2.0 (the "License");
@@ -19,13 +19,14 @@
 to a deprecated repository."""
 
 
-import glob
+from collections import defaultdict
+import errno
 import os
 import shutil
 from subprocess import call, Popen, CalledProcessError, PIPE
 import sys
 
-from spruce_tools import FoundationPlist
+from spruce_tools import fast_plist as FoundationPlist
 from spruce_tools.repo import Repo, ApplicationVersion
 from spruce_tools import report
 from spruce_tools import tools
@@ -46,8 +47,9 @@ def deprecate(args):
 
     cache = tools.build_pkginfo_cache(tools.get_repo_path())
     repo = Repo(cache)
+    name_index, category_index, loc_index = build_repo_indexes(repo)
 
-    removals = get_files_to_remove(args, repo)
+    removals = get_files_to_remove(args, repo, name_index, category_index)
     if not removals:
         sys.exit("Nothing to do! Exiting.")
 
@@ -56,10 +58,10 @@ def deprecate(args):
     removal_type = "archived" if args.archive else "removed"
     print_removals(removals, removal_type)
     print_manifest_removals(names)
-    warn_about_multiple_refs(removals, repo)
+    warn_about_multiple_refs(removals, loc_index)
 
     if not args.force:
-        response = raw_input("Are you sure you want to continue? (Y|N): ")
+        response = input("Are you sure you want to continue? (Y|N): ")
         if response.upper() not in ("Y", "YES"):
             sys.exit()
 
@@ -71,10 +73,30 @@ def deprecate(args):
     if args.git:
         git_rm(removals)
 
-    remove_names_from_manifests(names)
+    remove_names_from_manifests(names, cache, removals)
 
 
-def get_files_to_remove(args, repo):
+def build_repo_indexes(repo):
+    """Build reverse indexes over every item in the repo.
+
+    Returns a tuple of defaultdicts mapping name, category, and
+    installer_item_location to the list of ApplicationVersion items
+    carrying that value, so removal specs and reference checks can
+    look items up directly rather than rescanning the whole repo.
+    """
+    name_index = defaultdict(list)
+    category_index = defaultdict(list)
+    loc_index = defaultdict(list)
+    for app in repo:
+        for item in repo[app]:
+            name_index[item.name].append(item)
+            category_index[item.pkginfo.get("category")].append(item)
+            if item.pkg_path:
+                loc_index[item.pkg_path].append(item)
+    return (name_index, category_index, loc_index)
+
+
+def get_files_to_remove(args, repo, name_index, category_index):
     """Build and return a list of files to remove."""
     removals = set()
     # TODO: Refactor
@@ -85,9 +107,10 @@ def get_files_to_remove(args, repo):
             sys.exit("Please provide an integer value for the --auto option.")
         return get_removals_from_auto(levels, repo)
     if args.category:
-        removals.update(get_removals_for_categories(args.category, repo))
+        removals.update(get_removals_for_categories(args.category,
+                                                    category_index))
     if args.name:
-        removals.update(get_removals_for_names(args.name, repo))
+        removals.update(get_removals_for_names(args.name, name_index))
     if args.plist:
         removals.update(get_removals_from_plist(args.plist, repo))
     return removals
@@ -99,7 +122,7 @@ def get_removals_from_auto(level, repo):
     manifest_items = report.get_manifest_items(
         tools.get_manifests())
     used_items = repo.get_used_items(
-        manifest_items, sys.maxint, ("production",))
+        manifest_items, sys.maxsize, ("production",))
     current_items = repo.get_used_items(manifest_items, level, ("production",))
 
     removals = used_items - current_items
@@ -107,15 +130,15 @@ def get_removals_from_auto(level, repo):
     return removals
 
 
-def get_removals_for_categories(categories, repo):
+def get_removals_for_categories(categories, category_index):
     """Get all pkginfo and pkg files to remove by category."""
-    return {item for app in repo for item in repo[app] if
-            item.pkginfo.get("category") in categories}
+    return {item for category in categories for item in
+            category_index.get(category, [])}
 
 
-def get_removals_for_names(names, repo):
+def get_removals_for_names(names, name_index):
     """Get all pkginfo and pkg files to remove by name."""
-    return {item for app in repo for item in repo[app] if item.name in names}
+    return {item for name in names for item in name_index.get(name, [])}
 
 
 def get_removals_from_plist(path, repo):
@@ -149,81 +172,65 @@ def get_names_to_remove(removals, cache):
     # We only want to remove products from manifests if we are removing
     # ALL of that product.
 
-    # Copy the pkginfo cache. You can't use copy.deepcopy on ObjC
-    # objects. So we convert to dict (which copies).
-    future_cache = dict(cache)
-    # Remove all of the planned removals.
+    removal_paths = set()
+    removal_names = set()
     for removal in removals:
         if isinstance(removal, ApplicationVersion):
-            if removal.pkginfo_path in future_cache:
-                del future_cache[removal.pkginfo_path]
+            removal_paths.add(removal.pkginfo_path)
+            removal_names.add(removal.name)
         else:
-            if removal in future_cache:
-                del future_cache[removal]
-    # Make a set of all of the remaining names.
-    remaining_names = {future_cache[path].get("name") for path in future_cache}
-    # Make a set of all of the names from removals list.
-    removal_names = {cache[removal].get("name") for removal in removals if
-                     isinstance(removal, basestring) and removal in cache}
-    # removal_names = {cache[item].get("name") for removal in removals for item in removal.paths if item in
-    #                  cache}
-    removal_names.update(removal.name for removal in removals if
-                         isinstance(removal, ApplicationVersion))
+            removal_paths.add(removal)
+            if removal in cache:
+                removal_names.add(cache[removal].get("name"))
+    # Names still in use after the removals; a single pass with set
+    # lookups, rather than copying the cache and deleting from it.
+    remaining_names = {plist.get("name") for path, plist in cache.items() if
+                       path not in removal_paths}
     # The difference tells us which products we are completely removing.
-    names_to_remove = removal_names - remaining_names
-    return names_to_remove
+    return removal_names - remaining_names
 
 
 def print_removals(removals, removal_type):
     """Pretty print the files to remove."""
     bar = 75 * "-"
-    print "Items to be {}".format(removal_type)
+    print("Items to be {}".format(removal_type))
     last_name = ""
     app_versions = {item for item in removals if
                     isinstance(item, ApplicationVersion)}
     for item in sorted(app_versions):
         if last_name != item.name:
-            print bar
-        print "<pkginfo{}> {}".format(" + pkg" if item.pkg_path else "",
-                                      str(item))
+            print(bar)
+        print("<pkginfo{}> {}".format(" + pkg" if item.pkg_path else "",
+                                       str(item)))
         last_name = item.name
     for item in sorted(removals - app_versions):
-        print bar
-        print item
+        print(bar)
+        print(item)
 
-    print
+    print()
 
 
 def print_manifest_removals(names):
     """Pretty print the names to remove from manifests."""
-    print "Items to be removed from manifests:"
+    print("Items to be removed from manifests:")
     for item in sorted(names):
-        print "\t{}".format(item)
+        print("\t{}".format(item))
 
-    print
+    print()
 
 
-def warn_about_multiple_refs(removals, repo):
+def warn_about_multiple_refs(removals, loc_index):
     """Alert user about possible pkg removal dependencies."""
     # Check for pkginfo files that are NOT to be removed which reference
     # any pkgs to be removed and warn the user!
-    # for path, plist in cache.items():
-    #     if (not path in removals and
-    #             plist.get("installer_item_location") in removals):
-    #         print ("WARNING: Package '{}' is targeted for removal, but has "
-    #                "references in pkginfo '{}' which is not targeted for "
-    #                "removal.".format(
-    #                    plist.get("intaller_item_location"), path))
-    pkg_removals = {item.pkg_path for item in removals if item.pkg_path}
-    for app in repo:
-        for item in repo[app]:
-            if (item not in removals and
-                    item.pkginfo.get("installer_item_location") in
-                    pkg_removals):
-                print ("WARNING: Package '{}' is targeted for removal, but has "
-                   "references in pkginfo '{}' which is not targeted for "
-                   "removal.".format(
-                       item.pkginfo.get("installer_item_location"), item.pkginfo_path))
+    pkg_removals = {item.pkg_path for item in removals if
+                    isinstance(item, ApplicationVersion) and item.pkg_path}
+    for pkg_path in pkg_removals:
+        for item in loc_index.get(pkg_path, []):
+            if item not in removals:
+                print("WARNING: Package '{}' is targeted for removal, but has "
+                      "references in pkginfo '{}' which is not targeted for "
+                      "removal.".format(pkg_path, item.pkginfo_path))
 
 
 def move_to_archive(removals, archive_path):
@@ -249,21 +256,30 @@ def move_to_archive(removals, archive_path):
             archive_item = os.path.join(archive_path, archive_item)
             make_folders(os.path.dirname(archive_item))
             try:
-                shutil.move(path, archive_item)
-                print "Archived '{}' to '{}'.".format(path, archive_item)
+                try:
+                    # A plain rename is instant when the archive lives
+                    # on the same filesystem as the repo.
+                    os.rename(path, archive_item)
+                except OSError:
+                    # Cross-device (or other rename failure); let
+                    # shutil.move do the copy-and-delete.
+                    shutil.move(path, archive_item)
+                print("Archived '{}' to '{}'.".format(path, archive_item))
             except (IOError, OSError) as err:
-                print "Failed to remove item '{}' with error '{}'.".format(
-                    path, err.strerror)
+                print("Failed to remove item '{}' with error '{}'.".format(
+                    path, err.strerror))
 
 
 def make_folders(folder):
     """Make all folders in path that are missing."""
-    if not os.path.exists(folder):
-        try:
-            os.makedirs(folder)
-        except OSError:
-            print ("Failed to create archive directory {}! "
-                   "Quitting.".format(folder))
+    # EAFP: called once per archived item, so skip the exists() stat
+    # and just tolerate folders that are already there.
+    try:
+        os.makedirs(folder)
+    except OSError as error:
+        if error.errno != errno.EEXIST:
+            print("Failed to create archive directory {}! "
+                  "Quitting.".format(folder))
             sys.exit(1)
 
 
@@ -282,20 +298,20 @@ def remove(removals):
             if os.path.isfile(path):
                 try:
                     os.remove(path)
-                    print "Removed '{}'.".format(path)
+                    print("Removed '{}'.".format(path))
                 except (IOError, OSError) as error:
-                    print ("Unable to remove {} with error: {}".format(
+                    print("Unable to remove {} with error: {}".format(
                         path, error.strerror))
             elif os.path.isdir(path):
                 try:
                     shutil.rmtree(path)
-                    print "Removed '{}'.".format(path)
+                    print("Removed '{}'.".format(path))
                 except (IOError, OSError) as error:
-                    print ("Unable to remove {} with error: {}".format(
+                    print("Unable to remove {} with error: {}".format(
                         path, error.strerror))
             else:
-                print "Skipping '{}' as it does not seem to exist.".format(
-                    path)
+                print("Skipping '{}' as it does not seem to exist.".format(
+                    path))
 
 
 def git_rm(removals):
@@ -311,29 +327,45 @@ def git_rm(removals):
 
         for path in removal_paths:
             proc = Popen(["git", "-C", tools.get_repo_path(),
-                            "rm", "-r", path], stdout=PIPE, stderr=PIPE)
+                            "rm", "-r", path], stdout=PIPE, stderr=PIPE,
+                         universal_newlines=True)
             stdout, stderr = proc.communicate()
 
             if proc.returncode != 0:
                 if "did not match any files" in stderr:
-                    print ("File '{}' is not under version control. "
-                            "Skipping.".format(path))
+                    print("File '{}' is not under version control. "
+                          "Skipping.".format(path))
                 else:
-                    print "git rm failed for {} with error: {}".format(
-                        path, stderr)
+                    print("git rm failed for {} with error: {}".format(
+                        path, stderr))
+
 
+def remove_names_from_manifests(names, cache=None, removals=None):
+    """Remove names from all manifests.
 
-def remove_names_from_manifests(names):
-    """Remove names from all manifests."""
+    Args:
+        names: Set of product names to remove.
+        cache: Optional pkginfo cache built before the removals were
+            carried out. Together with removals, it describes the
+            post-removal repo without re-walking pkgsinfo.
+        removals: Optional iterable of removed items
+            (ApplicationVersion or path).
+    """
     if not names:
         return
 
-    # Build a new cache post-removal. We haven't run makecatalogs, so
-    # we can't use the catalogs for this task.
-    repo_path = tools.get_repo_path()
-
-    cache = tools.build_pkginfo_cache(repo_path)
-    remaining_names = {pkginfo.get("name") for pkginfo in cache.values()}
+    # We haven't run makecatalogs, so we can't use the catalogs for
+    # this task.
+    if cache is not None and removals is not None:
+        removal_paths = {removal.pkginfo_path if
+                         isinstance(removal, ApplicationVersion) else removal
+                         for removal in removals}
+        remaining_names = {plist.get("name") for path, plist in cache.items()
+                           if path not in removal_paths}
+    else:
+        # No pre-removal cache to work from; build one post-removal.
+        cache = tools.build_pkginfo_cache(tools.get_repo_path())
+        remaining_names = {pkginfo.get("name") for pkginfo in cache.values()}
     # Use set arithmetic to remove names that are still active in the
     # repo from our removals set.
     names_to_remove = names - remaining_names
@@ -363,8 +395,8 @@ def remove_names_from_manifest(manifest_path, manifest, removals):
         if changes:
             changed = True
             for change in changes:
-                print ("\tRemoved '{}' from section '{}' of manifest"
-                       "'{}'").format(change, section, manifest_path)
+                print("\tRemoved '{}' from section '{}' of manifest"
+                      "'{}'".format(change, section, manifest_path))
 
     if changed:
         FoundationPlist.writePlist(manifest, manifest_path)
@@ -381,20 +413,24 @@ def handle_name_removal(array, names_to_remove):
     Returns:
         List of removed names.
     """
-    removals = []
     changes = []
+    kept = []
 
+    # str.startswith rebuilds nothing per item this way; the tuple is
+    # constructed once per section rather than twice per manifest item.
+    prefixes = tuple(names_to_remove)
     for item in array:
         if item in names_to_remove:
-            removals.append(item)
-        elif (item.startswith(tuple(names_to_remove)) and not
-              item.endswith(tuple(names_to_remove))):
-            print ("\tDeprecator found item '{}' from section '{}' that may "
-                   "match a name to remove, but the length is wrong. "
-                   "Please remove manually if required!").format(item, section)
-    for item in removals:
-        array.remove(item)
-        changes.append(item)
+            changes.append(item)
+            continue
+        if (prefixes and item.startswith(prefixes) and not
+                item.endswith(prefixes)):
+            print("\tDeprecator found item '{}' that may match a name to "
+                  "remove, but the length is wrong. Please remove manually "
+                  "if required!".format(item))
+        kept.append(item)
+    # Splice in place; the manifest still references this array.
+    array[:] = kept
 
     return changes
 
@@ -1,4 +1,4 @@
-#!/usr/bin/python
+#!/usr/bin/env python3
 # Copyright 2016 Shea G. Craig
 #
 # Licensed under the Apache License, Version 2.0 (the "License");
@@ -20,20 +20,19 @@
 
 import codecs
 from collections import defaultdict
-from distutils.version import LooseVersion
 import os
 import sys
-from urllib import quote
+from urllib.parse import quote
 
 try:
     import markdown
 except ImportError:
-    print ("Markdown->html output not supported.")
-    print ("Please install the 'markdown' python package with either "
-           "`pip install markdown` or `easy_install markdown`.")
+    print("Markdown->html output not supported.")
+    print("Please install the 'markdown' python package with "
+          "`pip install markdown`.")
     markdown = None
 
-import tools
+from spruce_tools import tools
 
 
 class Markdown(object):
@@ -90,7 +89,7 @@ class Markdown(object):
 
     def __repr__(self, indent=0):
         """Represent as indented list of contained objects"""
-        result = ["{}: {}...".format(unicode(type(self)), self.text[:20])]
+        result = ["{}: {}...".format(type(self), self.text[:20])]
         indent += 1
         for element in self._elements:
             result.append("{}{}".format(
@@ -137,11 +136,11 @@ class Table(Markdown):
 
             # Pad empty cells.
             if len(self.header) < max_table_width:
-                self.header += ["" for _ in xrange(
+                self.header += ["" for _ in range(
                     max_table_width - len(self.header))]
             for row in self.rows:
                 if len(row) < max_table_width:
-                    row += ["" for _ in xrange(max_table_width - len(row))]
+                    row += ["" for _ in range(max_table_width - len(row))]
 
             lengths = [3] * max_table_width
 
@@ -150,7 +149,7 @@ class Table(Markdown):
             data += [row for row in self.rows]
 
             for row in data:
-                for cell, index in zip(row, xrange(len(row))):
+                for cell, index in zip(row, range(len(row))):
                     if len(cell) > lengths[index]:
                         lengths[index] = len(cell)
 
@@ -170,7 +169,7 @@ class Table(Markdown):
                     # TODO: Why did this get in here?
                     #value = unicode(value).encode("utf-8").strip()
                     #cell = "{0:<{fill}}".format(value.strip(), fill=width)
-                    cell = u"{0:<{fill}}".format(value.strip(), fill=width)
+                    cell = "{0:<{fill}}".format(value.strip(), fill=width)
                     formatted_row.append(cell)
                 formatted_data.append(self._table_delimit(formatted_row))
             data = "\n".join(formatted_data)
@@ -186,7 +185,7 @@ class Table(Markdown):
 
     def _table_delimit(self, row):
         """Add pipes before, after, and between all elements of row."""
-        return u"| {} |".format(" | ".join(row))
+        return "| {} |".format(" | ".join(row))
 
 
 def handle_docs(args):
@@ -202,8 +201,9 @@ def handle_docs(args):
     rows = {}
     for name, item in get_item_info(pkgsinfo).items():
         versions = ", ".join("[{}]({})".format(
-            ver[0].__str__(), quote(ver[1])) for
-            ver in sorted(item["versions"]))
+            ver[0], quote(ver[1])) for
+            ver in sorted(item["versions"], key=lambda ver:
+                          (tools.version_key(ver[0]), ver[1])))
         row = (name, item["display_name"], versions,
                item["notes"].replace("\n", " "))
         rows[name] = row
@@ -230,10 +230,11 @@ def get_item_info(pkgsinfo):
         item = items[pkginfo.get("name")]
         if "versions" not in item:
             item["versions"] = []
-        version = LooseVersion(pkginfo.get("version", "0.0"))
+        version = pkginfo.get("version", "0.0")
         item["versions"].append((version, path))
         # Update output item with highest version of each product.
-        if version == max(ver[0] for ver in item["versions"]):
+        if tools.version_key(version) == max(tools.version_key(ver[0]) for
+                                             ver in item["versions"]):
             keys = ("notes", "display_name")
             for key in keys:
                 item[key] = pkginfo.get(key, "")
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# Copyright 2016 Shea G. Craig
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+#
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""fast_plist.py -- read and write plists without the ObjC bridge.
+
+Parses plists with Python 3's plistlib, which uses the C-accelerated
+expat parser for XML plists and also handles binary plists. This is
+considerably faster than FoundationPlist for the thousands of pkginfo
+reads a report does, and the plain dicts it returns can be copied and
+pickled, unlike NSDictionaries.
+
+The API mirrors FoundationPlist's read/write functions, so callers can
+simply do ``import fast_plist as FoundationPlist``.
+"""
+
+
+import plistlib
+from xml.parsers.expat import ExpatError
+
+
+class FoundationPlistException(Exception):
+    """Basic exception for plist errors."""
+    pass
+
+
+class NSPropertyListSerializationException(FoundationPlistException):
+    """Read/parse error for plists."""
+    pass
+
+
+class NSPropertyListWriteException(FoundationPlistException):
+    """Write error for plists."""
+    pass
+
+
+def readPlist(filepath):
+    """Read a .plist file from filepath. Return the unpacked root
+    object (which is usually a dictionary)."""
+    try:
+        with open(filepath, "rb") as plist_file:
+            return plistlib.load(plist_file)
+    except (ExpatError, plistlib.InvalidFileException, ValueError,
+            OverflowError, OSError) as err:
+        raise NSPropertyListSerializationException(
+            "{} in file {}".format(err, filepath))
+
+
+def readPlistFromString(data):
+    """Read a plist from a byte string. Return the root object."""
+    try:
+        return plistlib.loads(data)
+    except (ExpatError, plistlib.InvalidFileException, ValueError,
+            OverflowError) as err:
+        raise NSPropertyListSerializationException(err)
+
+
+def writePlist(dataObject, filepath):
+    """Write 'dataObject' as an XML plist to filepath."""
+    # Serialize to memory first so a failed dump (e.g. an unsupported
+    # object type) can never leave a truncated file behind.
+    try:
+        data = plistlib.dumps(dataObject)
+    except (TypeError, OverflowError, ValueError) as err:
+        raise NSPropertyListWriteException(
+            "Failed to serialize plist data for {}: {}".format(filepath, err))
+    try:
+        with open(filepath, "wb") as plist_file:
+            plist_file.write(data)
+    except OSError as err:
+        raise NSPropertyListWriteException(
+            "Failed to write plist data to {}: {}".format(filepath, err))
+
+
+def writePlistToString(rootObject):
+    """Return 'rootObject' as a plist-formatted string."""
+    try:
+        return plistlib.dumps(rootObject).decode("utf-8")
+    except (TypeError, OverflowError, ValueError) as err:
+        raise NSPropertyListWriteException(err)
@@ -1,4 +1,4 @@
-#!/usr/bin/python
+#!/usr/bin/env python3
 # Copyright 2016 Shea G. Craig
 #
 # Licensed under the Apache License, Version 2.0 (the "License");
@@ -26,7 +26,7 @@ import shutil
 import sys
 from xml.sax.saxutils import escape
 
-import tools
+from spruce_tools import tools
 
 
 NO_CATEGORY = "*NO CATEGORY*"
@@ -41,7 +41,7 @@ def handle_icons(args):
     cache = tools.build_pkginfo_cache(tools.get_repo_path())
     unused_icons = get_unused_icons(tools.get_icons_path(), cache)
     if not unused_icons:
-        print "No unused icons found."
+        print("No unused icons found.")
         sys.exit()
 
     if not args.delete and not args.archive:
@@ -58,7 +58,7 @@ def handle_icons(args):
     report_list(unused_icons, "Icons to {}:".format(method))
 
     if not args.force:
-        response = raw_input("Are you sure you want to continue? (Y|N): ")
+        response = input("Are you sure you want to continue? (Y|N): ")
         if response.upper() not in ("Y", "YES"):
             sys.exit()
 
@@ -97,12 +97,12 @@ def get_sub_paths(icon_path):
 
 def report_list(items, header="Items:", footer=None):
     """Pretty print a list of items."""
-    print header
+    print(header)
     for item in sorted(items):
-        print "\t{}".format(item)
+        print("\t{}".format(item))
     if footer:
-        print footer
-    print
+        print(footer)
+    print()
 
 
 def move_to_archive(archive_path, removals):
@@ -113,7 +113,7 @@ def move_to_archive(archive_path, removals):
     repo_prefix = tools.get_repo_path()
     for item in removals:
         archive_item = item.replace(repo_prefix, archive_path, 1)
-        print "Archiving icon to: {}".format(archive_item)
+        print("Archiving icon to: {}".format(archive_item))
         make_folders(os.path.dirname(archive_item))
         shutil.move(item, archive_item)
 
@@ -124,8 +124,8 @@ def make_folders(folder):
         try:
             os.makedirs(folder)
         except OSError:
-            print ("Failed to create archive directory {}! "
-                    "Quitting.".format(folder))
+            print("Failed to create archive directory {}! "
+                  "Quitting.".format(folder))
             sys.exit(1)
 
 
@@ -133,11 +133,11 @@ def remove(removals):
     """Delete a list of files."""
     for item in removals:
         try:
-            print "Deleting icon: {}".format(item)
+            print("Deleting icon: {}".format(item))
             os.remove(item)
         except OSError as error:
-            print ("Unable to remove {} with error: {}".format(
-                item, error.message))
+            print("Unable to remove {} with error: {}".format(
+                item, error.strerror))
 
 
 if __name__ == "__main__":
@@ -1,4 +1,4 @@
-#!/usr/bin/env python
+#!/usr/bin/env python3
 # Copyright (C) 2015 Shea G Craig
 #
 # This program is free software: you can redistribute it and/or modify
@@ -17,7 +17,6 @@
 
 import argparse
 from collections import defaultdict
-from distutils.version import LooseVersion
 import csv
 import os
 
@@ -49,7 +48,7 @@ def get_argument_parser():
 def get_names_and_versions(all_plist):
     names = defaultdict(list)
     for pkginfo in all_plist:
-        names[pkginfo["name"]].append(LooseVersion(pkginfo["version"]))
+        names[pkginfo["name"]].append(pkginfo["version"])
 
     return names
 
@@ -61,11 +60,11 @@ def print_report(report, search):
             report = {key: val for key, val in report.items() if
                       search in key.upper()}
         for name, versions in sorted(report.items()):
-            print name
-            for version in sorted(versions):
-                print "\t" + str(version)
+            print(name)
+            for version in sorted(versions, key=tools.version_key):
+                print("\t" + version)
     else:
         if search:
             search = search.upper()
             report = (item for item in report if search in item.upper())
-        print "\n".join(sorted(item for item in report))
\ No newline at end of file
+        print("\n".join(sorted(item for item in report)))
\ No newline at end of file
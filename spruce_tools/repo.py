@@ -1,4 +1,4 @@
-#!/usr/bin/env python
+#!/usr/bin/env python3
 # Copyright (C) 2015 Shea G Craig
 #
 # This program is free software: you can redistribute it and/or modify
@@ -15,11 +15,10 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 
-from distutils.version import LooseVersion
 import os
 
-from robo_print import robo_print, LogLevel
-import tools
+from spruce_tools.robo_print import robo_print, LogLevel
+from spruce_tools import tools
 
 
 PKGINFO_EXTENSIONS = (".pkginfo", ".plist")
@@ -52,8 +51,8 @@ class Repo(object):
         for manifest_item in manifest_items:
             # TODO: Add parameter for os version support.
             # Support 10.9-10.12
-            for major in xrange(8, 13):
-                for minor in xrange(0, 10):
+            for major in range(8, 13):
+                for minor in range(0, 10):
                     test_version = "10.{}.{}".format(major, minor)
                     used = (self.get_used_items_by_os(
                         manifest_item, self, test_version, num_to_save, used,
@@ -86,12 +85,12 @@ class Repo(object):
             candidates = app
 
         count = 0
-        test_version = LooseVersion(os_version)
+        test_version = tools.version_key(os_version)
 
         # Application objects iterate in newest-to-oldest order.
         for item in candidates:
-            min_version = LooseVersion(item.min_version or "10.4.0")
-            max_version = LooseVersion(item.max_version or "10.12.99")
+            min_version = tools.version_key(item.min_version or "10.4.0")
+            max_version = tools.version_key(item.max_version or "10.12.99")
 
             if (test_version >= min_version and
                     test_version <= max_version and
@@ -265,20 +264,21 @@ class ApplicationVersion(object):
 
         return output
 
-    def __cmp__(self, other):
-        if self.name < other.name:
-            return -1
-        elif self.name > other.name:
-            return 1
-        else:
-            version = LooseVersion(self.version)
-            other = LooseVersion(other.version)
-            if version < other:
-                return -1
-            elif version == other:
-                return 0
-            else:
-                return 1
+    def _compare_key(self):
+        return (self.name or "", tools.version_key(self.version))
+
+    def __eq__(self, other):
+        return self._compare_key() == other._compare_key()
+
+    def __lt__(self, other):
+        return self._compare_key() < other._compare_key()
+
+    def __gt__(self, other):
+        return self._compare_key() > other._compare_key()
+
+    # Keep identity hashing, as under the old __cmp__-based ordering;
+    # items live in sets and must not collapse on (name, version).
+    __hash__ = object.__hash__
 
     def add_dependencies(self, repo):
         for required_name in self.pkginfo.get("requires", []):
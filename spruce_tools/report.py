@@ -1,4 +1,4 @@
-#!/usr/bin/env python
+#!/usr/bin/env python3
 # Copyright (C) 2015 Shea G Craig
 #
 # This program is free software: you can redistribute it and/or modify
@@ -15,21 +15,62 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 
-from distutils.version import LooseVersion
 from operator import itemgetter
 import os
+import pickle
 import sys
 import textwrap
 
-import cruftmoji
-from repo import Repo
-from robo_print import robo_print, LogLevel
-import sys
-import tools
-import FoundationPlist
+from spruce_tools import cruftmoji
+from spruce_tools.repo import Repo
+from spruce_tools.robo_print import robo_print, LogLevel
+from spruce_tools import tools
+from spruce_tools import fast_plist as FoundationPlist
 
 
 IGNORED_FILES = ('.DS_Store',)
+CACHE_DIR = os.path.expanduser("~/.cache/spruce")
+CACHE_PATH = os.path.join(CACHE_DIR, "expanded_cache.pkl")
+# Bump whenever the pickled cache layout changes, so older pickles are
+# treated as misses rather than unpickled into the wrong shape.
+CACHE_FORMAT = 1
+
+_version_keys = {}
+
+
+def _version_key(version):
+    """Return a memoized sort key for a version string.
+
+    Version strings repeat heavily across items and reports, so each
+    distinct one is parsed only once per run.
+    """
+    try:
+        return _version_keys[version]
+    except KeyError:
+        return _version_keys.setdefault(version, tools.version_key(version))
+
+
+class ExpandedCache(dict):
+    """Report input data that builds the Repo graph on first use.
+
+    Repo construction walks dependencies and stats every referenced
+    pkg, so invocations whose reports never touch "repo_data" should
+    not pay for it. The first access builds the Repo from the pkgsinfo
+    cache and refreshes the on-disk cache so later runs get it warm.
+    """
+
+    cache_key = None
+    errors = None
+
+    def __missing__(self, key):
+        if key != "repo_data":
+            raise KeyError(key)
+        repo_data = Repo(self["pkgsinfo"])
+        self["repo_data"] = repo_data
+        if self.cache_key is not None:
+            _save_report_cache(self.cache_key, self["pkgsinfo"], self.errors,
+                               repo_data)
+        return repo_data
 
 
 class Report(object):
@@ -51,6 +92,10 @@ class Report(object):
     items_order = []
     metadata_order = []
     separator = "-" * 20
+    # Shared by all reports; built once instead of per print_report.
+    spruce = cruftmoji.SPRUCE
+    wrapper = textwrap.TextWrapper(
+        width=73, initial_indent="\t", subsequent_indent="\t")
 
     def __init__(self, repo_data):
         self.items = []
@@ -64,41 +109,38 @@ class Report(object):
         pass
 
     def print_report(self):
-        print "{0} {1}{0} :".format(cruftmoji.SPRUCE, self.name)
+        print("{0} {1}{0} :".format(self.spruce, self.name))
         if self.description:
-            tab = "\t"
-            wrapper = textwrap.TextWrapper(
-                width=73, initial_indent=tab, subsequent_indent=tab)
-            print "\n".join(wrapper.wrap(self.description))
-            print
+            print("\n".join(self.wrapper.wrap(self.description)))
+            print()
         if self.items or self.metadata:
             if self.items_keys:
                 for key, reverse in reversed(self.items_keys):
                     if key == "version":
-                        self.items.sort(key=lambda v: LooseVersion(v[key]),
+                        self.items.sort(key=lambda v: _version_key(v[key]),
                                         reverse=reverse)
                     else:
                         self.items.sort(key=itemgetter(key), reverse=reverse)
             self._print_section("items")
             self._print_section("metadata")
         else:
-            print "\tNo items."
-            print
+            print("\tNo items.")
+            print()
 
     def _print_section(self, property):
         section = getattr(self, property)
         if len(section) > 0:
-            print "\t{}:".format(property.title())
-            print "\t" + self.separator
+            order = getattr(self, property + "_order")
+            print("\t{}:".format(property.title()))
+            print("\t" + self.separator)
             for item in section:
-                order = getattr(self, property + "_order")
                 for key in order:
-                    print "\t{}: {}".format(key, item[key])
+                    print("\t{}: {}".format(key, item[key]))
                 for key in item:
                     if not key in order:
-                        print "\t{}: {}".format(key, item[key])
-                print "\t" + self.separator
-            print
+                        print("\t{}: {}".format(key, item[key]))
+                print("\t" + self.separator)
+            print()
 
     def as_dict(self):
         return {"items": self.items, "metadata": self.metadata}
@@ -127,7 +169,7 @@ class OutOfDateReport(Report):
         #                        repo_data["repo_data"].applications.values() for
         #                        version in app)
         used_items  = repo_data["repo_data"].get_used_items(
-            repo_data["manifest_items"], sys.maxint, ("production",))
+            repo_data["manifest_items"], sys.maxsize, ("production",))
         current_items = repo_data["repo_data"].get_used_items(
             repo_data["manifest_items"], self.num_to_save, ("production",))
         out_of_date = used_items - current_items
@@ -153,6 +195,12 @@ class PathIssuesReport(Report):
 
     def run_report(self, repo_data):
         pkgs = os.path.join(repo_data["munki_repo"], "pkgs")
+        # Per-directory entry sets from the shared pkgs walk;
+        # get_bad_path used to os.listdir every directory it
+        # descended, per pkginfo.
+        self.listings = {}
+        for dirpath, dirnames, filenames in repo_data["pkgs_walk"]:
+            self.listings[dirpath] = set(dirnames) | set(filenames)
         for pkginfo, data in repo_data["pkgsinfo"].items():
             installer = data.get("installer_item_location")
             if installer:
@@ -164,15 +212,16 @@ class PathIssuesReport(Report):
                     self.items.append(result)
 
     def get_bad_path(self, installer, path):
+        entries = self.listings.get(path, frozenset())
         if "/" in installer:
             subdir = installer.split("/")[0]
-            if subdir in os.listdir(path):
+            if subdir in entries:
                 return self.get_bad_path(installer.split("/", 1)[1],
                                          os.path.join(path, subdir))
             else:
                 return subdir
         else:
-            return installer if installer not in os.listdir(path) else None
+            return installer if installer not in entries else None
 
 
 class MissingInstallerReport(Report):
@@ -185,11 +234,22 @@ class MissingInstallerReport(Report):
 
     def run_report(self, repo_data):
         pkgs = os.path.join(repo_data["munki_repo"], "pkgs")
+        # All paths present under pkgs, from the shared walk; each
+        # installer check becomes a set lookup instead of a stat.
+        # Lowercased, because the os.path.exists check this replaces
+        # matched case-insensitively on macOS's default filesystems;
+        # wrong-case locations are PathIssuesReport's job, not a
+        # missing installer.
+        existing = set()
+        for dirpath, _, filenames in repo_data["pkgs_walk"]:
+            existing.add(dirpath.lower())
+            existing.update(os.path.join(dirpath, filename).lower() for
+                            filename in filenames)
         for pkginfo, data in repo_data["pkgsinfo"].items():
             installer = data.get("installer_item_location")
             if installer:
                 installer_path = os.path.join(pkgs, installer)
-                if not os.path.exists(installer_path):
+                if os.path.normpath(installer_path).lower() not in existing:
                     result = {"name": data.get("name"),
                               "path": pkginfo,
                               "missing_installer": installer_path}
@@ -206,32 +266,40 @@ class OrphanedInstallerReport(Report):
 
     def run_report(self, repo_data):
         search_key = "installer_item_location"
-        # TODO: join full path
-        used_packages = {pkginfo[search_key] for pkginfo in
-                         repo_data["pkgsinfo"].values() if search_key in
-                         pkginfo}
+        # Normalize the recorded locations ("./Firefox.dmg",
+        # "apps//Firefox.dmg", "/apps/Firefox.dmg") so they compare
+        # equal to the relative paths derived from the walk.
+        used_packages = {
+            os.path.normpath(pkginfo[search_key]).lstrip("/") for pkginfo in
+            repo_data["pkgsinfo"].values() if pkginfo.get(search_key)}
         pkgs_dir = os.path.join(repo_data["munki_repo"], "pkgs")
         bundle_packages = set()
-        for dirpath, _, filenames in os.walk(pkgs_dir):
-            if any(bundle_pkg in dirpath for bundle_pkg in bundle_packages):
+        for dirpath, _, filenames in repo_data["pkgs_walk"]:
+            # A path-prefix test rather than substring containment, so
+            # a sibling like 'Thing.mpkg Backup' isn't mistaken for the
+            # contents of 'Thing.mpkg'.
+            if any(dirpath.startswith(bundle_pkg + os.sep) for bundle_pkg in
+                   bundle_packages):
                 # Contents of a bundle.
                 continue
-            elif os.path.splitext(dirpath)[1].upper() in (".PKG", ".MPKG"):
+            # Derive the repo-relative path once per directory, rather
+            # than splitting and re-slicing for every file.
+            rel_path = os.path.relpath(dirpath, pkgs_dir)
+            if rel_path == os.curdir:
+                rel_path = ""
+            if os.path.splitext(dirpath)[1].upper() in (".PKG", ".MPKG"):
                 # This is a non-flat package. Check for the dirname only,
-                # then move on to the next iteration.
-                if dirpath not in used_packages:
+                # then move on to the next iteration. Track every
+                # bundle, referenced or not, so its contents are never
+                # reported individually.
+                if rel_path not in used_packages:
                     self.items.append({"path": dirpath})
-                    bundle_packages.add(dirpath)
+                bundle_packages.add(dirpath)
                 continue
-            rel_path = dirpath.split(pkgs_dir)[1]
             for filename in filenames:
-                # Slice off preceding slash.
                 rel_filename = os.path.join(rel_path, filename)
-                rel_filename = (rel_filename[1:] if
-                                rel_filename.startswith("/") else rel_filename)
                 if rel_filename not in used_packages:
                     item_path = os.path.join(dirpath, filename)
-                    # result = {"name": item_path, "path": item_path}
                     result = {"path": item_path}
                     self.items.append(result)
 
@@ -249,7 +317,7 @@ class NoUsageReport(Report):
         all_applications = set(version for app in
                                repo_data["repo_data"].applications.values() for
                                version in app)
-        num_to_keep = sys.maxint
+        num_to_keep = sys.maxsize
         used_items  = repo_data["repo_data"].get_used_items(
             repo_data["manifest_items"], num_to_keep)
         unused = all_applications - used_items
@@ -302,14 +370,12 @@ class SimpleConditionReport(Report):
         self.items = self.get_info(self.conditions, repo_data["pkgsinfo"])
 
     def get_info(self, conditions, cache):
-        output = []
-        for path, pkginfo in cache.items():
-            if all(condition(pkginfo) for condition in conditions):
-                item = {"name": pkginfo["name"],
-                        "version": pkginfo["version"],
-                        "path": path}
-                output.append(item)
-        return sorted(output)
+        output = [{"name": pkginfo["name"],
+                   "version": pkginfo["version"],
+                   "path": path}
+                  for path, pkginfo in cache.items()
+                  if all(condition(pkginfo) for condition in conditions)]
+        return sorted(output, key=itemgetter("name", "version", "path"))
 
 
 class UnattendedTestingReport(SimpleConditionReport):
@@ -346,35 +412,48 @@ class ForceInstallProdReport(SimpleConditionReport):
                   lambda x: x.get("force_install_after_date") is not None)
 
 
+# Report run order for `spruce report`; the names are the values
+# accepted by the --reports flag.
+REPORTS = (
+    ("path-issues", PathIssuesReport),
+    ("missing-installers", MissingInstallerReport),
+    ("orphaned-installers", OrphanedInstallerReport),
+    ("pkginfo-errors", PkgsinfoWithErrorsReport),
+    ("out-of-date", OutOfDateReport),
+    ("unused", NoUsageReport),
+    ("unattended-testing", UnattendedTestingReport),
+    ("unattended-prod", UnattendedProdReport),
+    ("force-install-testing", ForceInstallTestingReport),
+    ("force-install-prod", ForceInstallProdReport))
+
+
 def run_reports(args):
     expanded_cache, errors = build_expanded_cache()
 
     # TODO: Add sorting to output or reporting.
-    report_results = []
-
-    report_results.append(PathIssuesReport(expanded_cache))
-    report_results.append(MissingInstallerReport(expanded_cache))
-    report_results.append(OrphanedInstallerReport(expanded_cache))
-    report_results.append(PkgsinfoWithErrorsReport(errors))
-    report_results.append(OutOfDateReport(expanded_cache))
-    report_results.append(NoUsageReport(expanded_cache))
-    # Add the results of the last two reports together to determine
-    # wasted disk space.
-    # expanded_cache["unused_items"] = [item for report in report_results[-2:]
-    #                                   for item in report.items]
-    # report_results.append(UnusedDiskUsageReport(expanded_cache))
-    report_results.append(UnattendedTestingReport(expanded_cache))
-    report_results.append(UnattendedProdReport(expanded_cache))
-    report_results.append(ForceInstallTestingReport(expanded_cache))
-    report_results.append(ForceInstallProdReport(expanded_cache))
+    # Restricting the run to reports that never read "repo_data" (e.g.
+    # path-issues or pkginfo-errors) also skips building the Repo graph
+    # entirely, thanks to the lazy ExpandedCache.
+    selected = getattr(args, "reports", None)
+    report_specs = [
+        (report_class,
+         errors if report_class is PkgsinfoWithErrorsReport else
+         expanded_cache)
+        for name, report_class in REPORTS
+        if not selected or name in selected]
 
     if args.plist:
-        dict_reports = {report.name: report.as_dict() for report in
-                        report_results}
-        print FoundationPlist.writePlistToString(dict_reports)
+        dict_reports = {}
+        for report_class, data in report_specs:
+            report = report_class(data)
+            dict_reports[report.name] = report.as_dict()
+        print(FoundationPlist.writePlistToString(dict_reports))
     else:
-        for report in report_results:
-            report.print_report()
+        # Run and print one report at a time, so each report's items
+        # can be freed before the next runs instead of accumulating
+        # every report's results in memory.
+        for report_class, data in report_specs:
+            report_class(data).print_report()
 
 
 def build_expanded_cache():
@@ -387,18 +466,89 @@ def build_expanded_cache():
     except FoundationPlist.NSPropertyListSerializationException:
         sys.exit("Please mount your Munki repo and try again.")
 
-    cache, errors = tools.build_pkginfo_cache_with_errors(munki_repo)
+    cache_key = _repo_cache_key(munki_repo, all_path)
+    cached = _load_report_cache(cache_key)
+    repo_data = None
+    if cached is not None:
+        cache, errors, repo_data = cached
+    else:
+        cache, errors = tools.build_pkginfo_cache_with_errors(munki_repo)
+        _save_report_cache(cache_key, cache, errors, None)
 
-    expanded_cache = {}
+    expanded_cache = ExpandedCache()
+    expanded_cache.cache_key = cache_key
+    expanded_cache.errors = errors
     expanded_cache["pkgsinfo"] = cache
     expanded_cache["munki_repo"] = munki_repo
     expanded_cache["manifest_items"] = get_manifest_items(
         tools.get_manifests())
-    expanded_cache["repo_data"] = Repo(expanded_cache["pkgsinfo"])
+    if repo_data is not None:
+        expanded_cache["repo_data"] = repo_data
+    # Walk the pkgs tree once; several reports consume the same
+    # listing. Cheap to rebuild, so it's not pickled.
+    expanded_cache["pkgs_walk"] = list(
+        os.walk(os.path.join(munki_repo, "pkgs")))
 
     return (expanded_cache, errors)
 
 
+def _repo_cache_key(munki_repo, all_path):
+    """Fingerprint the repo inputs that feed the expanded cache.
+
+    Combines the repo path with the newest nanosecond mtime seen in
+    the pkgsinfo, manifests, and pkgs trees (and the all catalog) and
+    per-tree file counts. Nanosecond resolution catches edits made
+    within the same second as the cached run; the counts catch
+    deletions that don't update directory mtimes on all filesystems.
+    pkgs is included because the pickled Repo bakes in pkg file sizes,
+    which can change independently of pkgsinfo. The repo path keeps
+    mtime-preserving mirrors (e.g. rsync -a staging copies) from
+    serving each other's caches when repo_path changes between runs.
+    """
+    newest = os.stat(all_path).st_mtime_ns
+    counts = []
+    for tree in ("pkgsinfo", "manifests", "pkgs"):
+        count = 0
+        for dirpath, _, filenames in os.walk(os.path.join(munki_repo, tree)):
+            count += len(filenames)
+            newest = max(newest, os.stat(dirpath).st_mtime_ns)
+            for filename in filenames:
+                try:
+                    newest = max(newest, os.stat(
+                        os.path.join(dirpath, filename)).st_mtime_ns)
+                except OSError:
+                    continue
+        counts.append(count)
+    return (CACHE_FORMAT, munki_repo, newest, tuple(counts))
+
+
+def _load_report_cache(key):
+    """Return cached (pkgsinfo, errors, repo_data), or None on miss."""
+    try:
+        with open(CACHE_PATH, "rb") as cache_file:
+            cached_key, cache, errors, repo_data = pickle.load(cache_file)
+    except (EnvironmentError, EOFError, pickle.UnpicklingError,
+            AttributeError, ValueError):
+        return None
+    if cached_key != key:
+        return None
+    return (cache, errors, repo_data)
+
+
+def _save_report_cache(key, cache, errors, repo_data):
+    """Pickle the parsed repo data for reuse by later invocations."""
+    try:
+        if not os.path.isdir(CACHE_DIR):
+            os.makedirs(CACHE_DIR)
+        with open(CACHE_PATH, "wb") as cache_file:
+            pickle.dump((key, cache, errors, repo_data), cache_file,
+                        pickle.HIGHEST_PROTOCOL)
+    except (EnvironmentError, pickle.PicklingError):
+        # Caching is best-effort; a failed write just means a cold run
+        # next time.
+        pass
+
+
 def get_manifest_items(manifests):
     """Determine all used items.
 
@@ -1,4 +1,4 @@
-#!/usr/bin/env python
+#!/usr/bin/env python3
 # Copyright (C) 2016 Shea G Craig
 #
 # This program is free software: you can redistribute it and/or modify
@@ -93,11 +93,11 @@ def robo_print(message, log_level=LogLevel.LOG, indent=0):
 
 
 def _print_stderr(txt):
-    print >> sys.stderr, txt
+    print(txt, file=sys.stderr)
 
 
 def _print_stdout(txt):
-    print txt
+    print(txt)
 
 
 def reset_term_colors():
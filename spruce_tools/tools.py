@@ -1,4 +1,4 @@
-#!/usr/bin/python
+#!/usr/bin/env python3
 # Copyright 2016 Shea G. Craig
 #
 # Licensed under the Apache License, Version 2.0 (the "License");
@@ -18,22 +18,38 @@
 """Helper functions for interacting with Munki repos."""
 
 
-import imp
+import multiprocessing
 import os
+import re
 import sys
 
 sys.path.append("/usr/local/munki")
 from munkilib import FoundationPlist
 
+from spruce_tools import fast_plist
+from spruce_tools.robo_print import robo_print, LogLevel
+
 
 IGNORED_FILES = ('.DS_Store',)
 PKGINFO_EXTENSIONS = (".pkginfo", ".plist")
+TESTING_CATALOGS = frozenset(
+    ("development", "testing", "phase1", "phase2", "phase3"))
 SPRUCE_PREFS = os.path.expanduser(
     "~/Library/Preferences/com.sheagcraig.spruce.plist")
 MUNKIIMPORT_PREFS = os.path.expanduser(
     "~/Library/Preferences/com.googlecode.munki.munkiimport.plist")
 
+# Memoized results; prefs are read from disk once per run, and
+# get_repo_path is called for every ApplicationVersion constructed.
+_prefs = None
+_repo_path = None
+
+
 def get_prefs():
+    global _prefs
+    if _prefs is not None:
+        return _prefs
+
     # If prefs don't exist yet, offer to help create them.
     try:
         prefs = FoundationPlist.readPlist(SPRUCE_PREFS)
@@ -43,6 +59,7 @@ def get_prefs():
     if not prefs or not prefs.get("repo_path"):
         prefs = build_prefs()
 
+    _prefs = prefs
     return prefs
 
 
@@ -58,7 +75,7 @@ def build_prefs():
         choice = None
         while choice is None:
             default = munkiimport_prefs.get(key, "")
-            choice = raw_input(
+            choice = input(
                 "Please enter a value for '{}' or hit enter to use the "
                 "default value '{}': ".format(key, default))
         prefs[key] = choice if choice else default
@@ -73,19 +90,20 @@ def get_manifests():
     manifest_dir = os.path.join(get_repo_path(), "manifests")
     manifests = {}
     for dirpath, dirnames, filenames in os.walk(manifest_dir):
-        for dirname in dirnames:
-            if dirname.startswith("."):
-                dirnames.remove(dirname)
+        # Prune hidden directories with a single in-place splice;
+        # removing entries while iterating skipped the next one.
+        dirnames[:] = [dirname for dirname in dirnames if not
+                       dirname.startswith(".")]
 
         for filename in filenames:
             if filename not in IGNORED_FILES and not filename.startswith("."):
                 manifest_filename = os.path.join(dirpath, filename)
                 try:
-                    manifests[manifest_filename] = FoundationPlist.readPlist(
+                    manifests[manifest_filename] = fast_plist.readPlist(
                         manifest_filename)
-                except FoundationPlist.NSPropertyListSerializationException as err:
+                except fast_plist.NSPropertyListSerializationException as err:
                     robo_print("Failed to open manifest '{}' with error "
-                               "'{}'.".format(manifest_filename, err.message),
+                               "'{}'.".format(manifest_filename, err),
                                LogLevel.WARNING)
     return manifests
 
@@ -109,15 +127,18 @@ def get_all_catalog():
 
 def get_repo_path():
     """Get path to the munki repo according to munkiimport's prefs."""
-    prefs = get_prefs()
-    return os.path.expanduser(prefs.get("repo_path"))
+    global _repo_path
+    if _repo_path is None:
+        prefs = get_prefs()
+        _repo_path = os.path.expanduser(prefs.get("repo_path"))
+    return _repo_path
 
 
 def get_munkiimport_prefs():
     """Get the current user's munkiimport preferences as plist dict."""
     try:
         prefs = FoundationPlist.readPlist(MUNKIIMPORT_PREFS)
-    except NSPropertyListSerializationException:
+    except FoundationPlist.NSPropertyListSerializationException:
         prefs = {}
     return prefs
 
@@ -175,28 +196,49 @@ def build_pkginfo_cache_with_errors(repo):
     pkginfos = {}
     errors = {}
     pkginfo_dir = os.path.join(repo, "pkgsinfo")
+    paths = []
     for dirpath, _, filenames in os.walk(pkginfo_dir):
-        for ifile in filter(is_pkginfo, filenames):
-            path = os.path.join(dirpath, ifile)
-            try:
-                pkginfo_file = FoundationPlist.readPlist(path)
-            except FoundationPlist.FoundationPlistException as error:
-                errors[path] = error.message
-                continue
-
-            pkginfos[path] = pkginfo_file
+        paths.extend(os.path.join(dirpath, ifile) for ifile in
+                     filter(is_pkginfo, filenames))
+
+    if paths:
+        # Every file parses independently, so spread the work across
+        # all cores. Processes rather than threads: parsing is mostly
+        # Python bytecode, which holds the GIL.
+        pool = multiprocessing.Pool()
+        try:
+            results = pool.map(_parse_one_pkginfo, paths, 32)
+        finally:
+            pool.close()
+            pool.join()
+
+        for path, pkginfo_file, error in results:
+            if error is not None:
+                errors[path] = error
+            else:
+                pkginfos[path] = pkginfo_file
 
     return (pkginfos, errors)
 
 
+def _parse_one_pkginfo(path):
+    """Parse a single pkginfo file (process pool worker).
+
+    Returns a tuple of (path, pkginfo dict, error message); exactly one
+    of the last two is None.
+    """
+    try:
+        return (path, fast_plist.readPlist(path), None)
+    except fast_plist.FoundationPlistException as error:
+        return (path, None, str(error))
+
+
 def is_pkginfo(candidate):
     return os.path.splitext(candidate)[-1].lower() in PKGINFO_EXTENSIONS
 
 
 def in_testing(pkginfo):
-    testing_catalogs = ("development", "testing", "phase1", "phase2",
-                        "phase3")
-    return any(catalog.lower() in testing_catalogs for catalog in
+    return any(catalog.lower() in TESTING_CATALOGS for catalog in
                pkginfo.get("catalogs", []))
 
 
@@ -230,3 +272,28 @@ def split_name_from_version(name_string):
                 return (name, vers)
 
     return (name_string, '')
+
+
+# The component pattern from distutils' LooseVersion, vendored here
+# because distutils left the stdlib in Python 3.12 (PEP 632).
+_version_component_re = re.compile(r"(\d+ | [a-z]+ | \.)", re.VERBOSE)
+
+
+def version_key(version):
+    """Return a sort key tuple for a version string.
+
+    Splits the string into components the way LooseVersion did
+    ('2.3b1' becomes [2, 3, 'b', 1]), which mixes ints and strings
+    that Python 3 refuses to compare against each other. Tag each
+    component with its type so numeric components order before
+    alphabetic ones, as they did under Python 2.
+    """
+    key = []
+    for part in _version_component_re.split(str(version)):
+        if not part or part == ".":
+            continue
+        try:
+            key.append((0, int(part)))
+        except ValueError:
+            key.append((1, part))
+    return tuple(key)
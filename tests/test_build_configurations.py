@@ -1,4 +1,4 @@
-#!/usr/bin/env python
+#!/usr/bin/env python3
 # Copyright 2015 Shea G. Craig
 #
 # Licensed under the Apache License, Version 2.0 (the "License");
@@ -16,15 +16,14 @@
 # limitations under the License.
 
 
-from munki_tools import FoundationPlist
-from nose.tools import *
+from spruce_tools import fast_plist as FoundationPlist
 
-import build_configurations
+import build_munki_profiles as build_configurations
 
 
 class TestBuildConfigurations(object):
 
-    def setUp(self):
+    def setup_method(self, method):
         self.manifests = ("IT", "General", "JMP")
         self.catalogs = ("testing", "phase1", "phase2")
 
@@ -34,7 +33,7 @@ class TestBuildConfigurations(object):
         results = list(build_configurations.get_permutations(
             self.manifests, self.catalogs))
         for expected in expecteds:
-            assert_in(expected, results)
+            assert expected in results
 
     def test_build_munki_config(self):
         expected_plist = FoundationPlist.readPlist(
@@ -42,7 +41,6 @@ class TestBuildConfigurations(object):
         result = build_configurations.build_munki_config(("IT", "Testing"))
         test_values = ("ClientIdentifier",)
         for key in test_values:
-            assert_equal(
-                expected_plist["PayloadContent"][0]["PayloadContent"]["ManagedInstalls"]["Forced"][0]["mcx_preference_settings"][key],
+            assert (
+                expected_plist["PayloadContent"][0]["PayloadContent"]["ManagedInstalls"]["Forced"][0]["mcx_preference_settings"][key] ==
                 result["PayloadContent"][0]["PayloadContent"]["ManagedInstalls"]["Forced"][0]["mcx_preference_settings"][key])
-